@@ -0,0 +1,17 @@
+"""Compile the financial kernel ahead of time into the shaver_kernel extension module.
+
+Run `python build_kernel.py` from the repository root. shaver_core.py imports
+shaver_kernel when it is present and falls back to the JIT kernel in py_kernel.py.
+"""
+from numba.pycc import CC
+
+import py_kernel
+
+cc = CC('shaver_kernel')
+
+# Export the pure Python function; its calls into irr_solve, irr_newton and
+# irr_bisect are compiled in
+cc.export('fin_kernel', 'Tuple((f4[:], f8, f8))(f8, f8, f8[:], f8)')(py_kernel.fin_kernel.py_func)
+
+if __name__ == '__main__':
+    cc.compile()
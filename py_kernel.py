@@ -0,0 +1,90 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; without it the kernels run as plain Python
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+@njit(cache=True)
+def irr_newton(C, A, N, guess=0.1, tol=1e-8, maxiter=50):
+    """Solve for the IRR of an upfront cost C followed by N equal annual savings A"""
+    r = guess
+    for _ in range(maxiter):
+        # Stop short of r = -1, where (1 + r) ** -N overflows in plain Python
+        if r <= -0.99:
+            break
+        growth = (1 + r) ** -N
+        if abs(r) < 1e-12:
+            # Annuity factor tends to N as the rate goes to zero
+            f = -C + A * N
+            fp = -A * N * (N + 1) / 2
+        else:
+            annuity = (1 - growth) / r
+            f = -C + A * annuity
+            fp = A * (N * growth / (1 + r) - annuity) / r
+        if fp == 0:
+            break
+        step = f / fp
+        r -= step
+        if abs(step) < tol:
+            return r
+    return np.nan
+
+@njit(cache=True)
+def irr_bisect(C, A, N, lo=-0.99, hi=10.0, tol=1e-8, maxiter=200):
+    """Bracketed IRR search for when Newton's method fails to converge"""
+    f_lo = -C + A * (1 - (1 + lo) ** -N) / lo
+    f_hi = -C + A * (1 - (1 + hi) ** -N) / hi
+    if f_lo * f_hi > 0:
+        return np.nan
+    for _ in range(maxiter):
+        mid = 0.5 * (lo + hi)
+        if abs(mid) < 1e-12:
+            f_mid = -C + A * N
+        else:
+            f_mid = -C + A * (1 - (1 + mid) ** -N) / mid
+        if f_mid * f_lo > 0:
+            lo, f_lo = mid, f_mid
+        else:
+            hi = mid
+        if hi - lo < tol:
+            break
+    return 0.5 * (lo + hi)
+
+@njit(cache=True)
+def irr_solve(C, A, N, guess):
+    """IRR by Newton's method from guess, falling back to bisection over [-0.99, 10]"""
+    irr = irr_newton(C, A, N, guess, 1e-8, 50)
+    if np.isnan(irr):
+        irr = irr_bisect(C, A, N, -0.99, 10.0, 1e-8, 200)
+    return irr
+
+@njit(cache=True)
+def fin_kernel(C, A, discount, r):
+    """Cumulative NPV, interpolated payback and IRR in a single pass over the years"""
+    N = discount.shape[0] - 1
+    # Store NPV in float32, ample for whole-dollar display; accumulate in float64
+    npv_values = np.empty(N + 1, dtype=np.float32)
+    npv_values[0] = -C
+    running_npv = -C
+    payback = 0.0 if running_npv >= 0 else np.inf
+    
+    # discount[year] is (1 + r) ** -year; accumulate the NPV slope alongside
+    # so the IRR seed needs no second pass
+    slope = 0.0
+    for year in range(1, N + 1):
+        df = discount[year]
+        previous_npv = running_npv
+        running_npv += A * df
+        slope -= year * A * df
+        npv_values[year] = running_npv
+        if payback == np.inf and running_npv >= 0:
+            payback = year - 1 - previous_npv / (running_npv - previous_npv)
+    slope /= 1.0 + r
+    
+    # The first Newton step from the discount rate comes straight out of the pass
+    guess = r - running_npv / slope if slope != 0 else r
+    irr = irr_solve(C, A, N, guess)
+    return npv_values, payback, irr
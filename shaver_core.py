@@ -0,0 +1,179 @@
+import pandas as pd
+import numpy as np
+import functools
+from dataclasses import dataclass
+
+try:
+    # Ahead-of-time compiled kernel, built by build_kernel.py
+    from shaver_kernel import fin_kernel
+except ImportError:
+    from py_kernel import fin_kernel
+
+@dataclass(slots=True, frozen=True)
+class Params:
+    """Input parameters; frozen so reruns with the same inputs hash identically"""
+    peak_load_kw: float
+    peak_duration_hours: float
+    battery_power_kw: float
+    battery_capacity_kwh: float
+    peak_demand_charge: float
+    battery_cost_per_kwh: float
+    inverter_cost_per_kw: float
+    installation_factor: float
+    discount_rate: float
+    analysis_years: int
+
+@functools.lru_cache(maxsize=256)
+def _discount_factors(r, N):
+    """Discount factors (1 + r) ** -year for years 0..N, reused across calls
+
+    The page already caches calculate_cashflows, so this only saves work on
+    its cache misses where the rate and horizon are unchanged.
+    """
+    factors = (1.0 + r) ** -np.arange(N + 1)
+    factors.flags.writeable = False
+    return factors
+
+def _system_cost(params, battery_capacity_kwh, battery_power_kw):
+    """Battery, inverter and installation cost; sizes may be scalars or arrays"""
+    battery_cost = battery_capacity_kwh * params.battery_cost_per_kwh
+    inverter_cost = battery_power_kw * params.inverter_cost_per_kw
+    installation_cost = (battery_cost + inverter_cost) * params.installation_factor
+    return battery_cost, inverter_cost, installation_cost
+
+def _peak_reduction(params, battery_capacity_kwh, battery_power_kw):
+    """Peak reduction limited by battery power and by usable energy over the peak"""
+    peak_load_kw = params.peak_load_kw
+    power_limited_reduction = np.minimum(battery_power_kw, peak_load_kw)
+    energy_limited_reduction = np.minimum(
+        battery_capacity_kwh * 0.9 / params.peak_duration_hours,
+        peak_load_kw
+    )
+    return np.minimum(power_limited_reduction, energy_limited_reduction)
+
+def _annual_savings(params, peak_reduction):
+    """Annual demand charge savings from a monthly peak reduction"""
+    monthly_savings = peak_reduction * params.peak_demand_charge
+    return monthly_savings * 12
+
+def calculate_system_cost(params):
+    """Calculate total system cost with separate battery and inverter components"""
+    battery_cost, inverter_cost, installation_cost = _system_cost(
+        params, params.battery_capacity_kwh, params.battery_power_kw
+    )
+    
+    return {
+        'battery_cost': battery_cost,
+        'inverter_cost': inverter_cost,
+        'installation_cost': installation_cost,
+        'total_cost': battery_cost + inverter_cost + installation_cost
+    }
+
+def calculate_cashflows(params):
+    """Calculate annual cash flows and financial metrics"""
+    # Get system costs
+    costs = calculate_system_cost(params)
+    total_system_cost = costs['total_cost']
+    
+    # Calculate peak reduction and annual savings
+    actual_peak_reduction = float(
+        _peak_reduction(params, params.battery_capacity_kwh, params.battery_power_kw)
+    )
+    annual_savings = _annual_savings(params, actual_peak_reduction)
+    
+    # Generate analysis years
+    analysis_years = params.analysis_years
+    years = np.arange(analysis_years + 1, dtype=np.int32)
+    
+    # Calculate cumulative NPV, payback period and IRR
+    # Round so widget float noise does not miss the discount factor cache
+    discount_rate = round(params.discount_rate / 100, 4)  # Convert percentage to decimal
+    npv_values, payback_period, irr = fin_kernel(
+        float(total_system_cost), float(annual_savings),
+        _discount_factors(discount_rate, analysis_years), discount_rate
+    )
+    
+    return {
+        'years': years,
+        'npv_values': npv_values,
+        'annual_savings': annual_savings,
+        'system_costs': costs,
+        'peak_reduction': actual_peak_reduction,
+        'irr': irr,
+        'payback_period': float(payback_period)
+    }
+
+def _annuity_npv(C, A, N, r):
+    """NPV of cost C and N annual savings A at rate r, elementwise over arrays"""
+    near_zero = np.abs(r) < 1e-12
+    safe_r = np.where(near_zero, 1.0, r)
+    # Annuity factor tends to N as the rate goes to zero
+    return -C + A * np.where(near_zero, N, (1 - (1 + r) ** -N) / safe_r)
+
+def irr_grid(C, A, N, r, tol=1e-8, maxiter=50):
+    """Solve IRR for many (C, A) pairs at once, mirroring py_kernel's irr_newton and irr_bisect"""
+    C, A = np.broadcast_arrays(np.asarray(C, dtype=np.float64), np.asarray(A, dtype=np.float64))
+    irr = np.full(C.shape, float(r))
+    active = np.ones(C.shape, dtype=bool)
+    converged = np.zeros(C.shape, dtype=bool)
+    
+    with np.errstate(all='ignore'):
+        # Broadcast Newton from the discount rate; cells stop once they fall to -0.99
+        for _ in range(maxiter):
+            active &= irr > -0.99
+            if not active.any():
+                break
+            x, c, a = irr[active], C[active], A[active]
+            growth = (1 + x) ** -N
+            near_zero = np.abs(x) < 1e-12
+            safe_x = np.where(near_zero, 1.0, x)
+            annuity = np.where(near_zero, N, (1 - growth) / safe_x)
+            f = -c + a * annuity
+            fp = np.where(near_zero, -a * N * (N + 1) / 2, a * (N * growth / (1 + x) - annuity) / safe_x)
+            step = f / fp
+            irr[active] = x - step
+            done = np.abs(step) < tol
+            cells = np.flatnonzero(active)
+            converged.flat[cells[done]] = True
+            active.flat[cells[done | ~np.isfinite(step)]] = False
+        
+        # Vectorized bisection over [-0.99, 10] for cells Newton left unconverged
+        failed = ~converged
+        if failed.any():
+            c, a = C[failed], A[failed]
+            lo = np.full(c.shape, -0.99)
+            hi = np.full(c.shape, 10.0)
+            f_lo = _annuity_npv(c, a, N, lo)
+            bracketed = f_lo * _annuity_npv(c, a, N, hi) <= 0
+            while hi[0] - lo[0] >= tol:
+                mid = 0.5 * (lo + hi)
+                f_mid = _annuity_npv(c, a, N, mid)
+                same_sign = f_mid * f_lo > 0
+                lo = np.where(same_sign, mid, lo)
+                f_lo = np.where(same_sign, f_mid, f_lo)
+                hi = np.where(same_sign, hi, mid)
+            irr[failed] = np.where(bracketed, 0.5 * (lo + hi), np.nan)
+    return irr
+
+def calculate_sensitivity(params, steps=11):
+    """Calculate IRR across a grid of battery capacities and powers around the current design"""
+    capacities = np.linspace(
+        max(10, params.battery_capacity_kwh * 0.5), min(2000, params.battery_capacity_kwh * 1.5), steps
+    )
+    powers = np.linspace(
+        max(10, params.battery_power_kw * 0.5), min(1000, params.battery_power_kw * 1.5), steps
+    )
+    capacity_grid, power_grid = np.meshgrid(capacities, powers)
+    
+    # Evaluate the calculate_cashflows cost and savings model for every cell
+    total_system_cost = sum(_system_cost(params, capacity_grid, power_grid))
+    annual_savings = _annual_savings(params, _peak_reduction(params, capacity_grid, power_grid))
+    
+    discount_rate = round(params.discount_rate / 100, 4)  # Same seed rate as calculate_cashflows
+    irr = irr_grid(total_system_cost, annual_savings, params.analysis_years, discount_rate)
+    
+    return pd.DataFrame({
+        'Battery Capacity (kWh)': capacity_grid.ravel(),
+        'Battery Power (kW)': power_grid.ravel(),
+        'IRR (%)': irr.ravel() * 100
+    })
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import py_kernel
+from shaver_core import Params, calculate_cashflows, calculate_sensitivity, irr_grid
+
+
+def _reference_irr(C, A, N, r):
+    irr = py_kernel.irr_newton(C, A, N, r, 1e-8, 50)
+    if np.isnan(irr):
+        irr = py_kernel.irr_bisect(C, A, N, -0.99, 10.0, 1e-8, 200)
+    return irr
+
+
+def _random_params(rng):
+    return Params(
+        peak_load_kw=float(rng.integers(10, 1001)),
+        peak_duration_hours=float(rng.uniform(0.5, 8.0)),
+        battery_power_kw=float(rng.integers(10, 1001)),
+        battery_capacity_kwh=float(rng.integers(10, 2001)),
+        peak_demand_charge=float(rng.integers(5, 51)),
+        battery_cost_per_kwh=float(rng.integers(100, 1001)),
+        inverter_cost_per_kw=float(rng.integers(100, 1001)),
+        installation_factor=float(rng.uniform(0.1, 1.0)),
+        discount_rate=float(rng.choice(np.arange(0.0, 20.5, 0.5))),
+        analysis_years=int(rng.integers(5, 31))
+    )
+
+
+def test_irr_grid_matches_scalar_solver():
+    rng = np.random.default_rng(0)
+    r = 0.08
+    # Short and long horizons both include cells that fall through to bisection
+    for N in (5, 15, 30):
+        C = rng.uniform(1e3, 2e6, 500)
+        A = rng.uniform(0, 2e5, 500)
+        expected = [_reference_irr(c, a, N, r) for c, a in zip(C, A)]
+        np.testing.assert_allclose(irr_grid(C, A, N, r), expected, rtol=1e-7, atol=1e-9)
+
+
+def test_sensitivity_has_no_missing_cells_for_negative_irr():
+    params = Params(1000, 2.5, 10, 2000, 22, 1000, 200, 0.3, 8.0, 15)
+    assert calculate_cashflows(params)['irr'] < 0
+    assert not calculate_sensitivity(params)['IRR (%)'].isna().any()
+
+
+def test_sensitivity_has_no_missing_cells_for_random_inputs():
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        assert not calculate_sensitivity(_random_params(rng))['IRR (%)'].isna().any()
+
+
+def test_sensitivity_cells_are_distinct_for_small_designs():
+    params = Params(72, 2.5, 10, 10, 22, 300, 200, 0.3, 8.0, 15)
+    sensitivity = calculate_sensitivity(params)
+    cells = sensitivity[['Battery Capacity (kWh)', 'Battery Power (kW)']].drop_duplicates()
+    assert len(cells) == len(sensitivity)
+
+
+def test_sensitivity_matches_cashflows_irr():
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        params = _random_params(rng)
+        sensitivity = calculate_sensitivity(params)
+        for capacity, power, irr in sensitivity.sample(5, random_state=0).itertuples(index=False):
+            cell = Params(**{
+                **{name: getattr(params, name) for name in Params.__dataclass_fields__},
+                'battery_capacity_kwh': capacity,
+                'battery_power_kw': power
+            })
+            assert np.isclose(irr, calculate_cashflows(cell)['irr'] * 100, atol=1e-6)
+
+
+def test_aot_kernel_matches_jit_kernel():
+    shaver_kernel = pytest.importorskip('shaver_kernel')
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        C, A = rng.uniform(1e3, 2e6), rng.uniform(0, 2e5)
+        r, N = rng.uniform(0, 0.2), int(rng.integers(5, 31))
+        discount = (1.0 + r) ** -np.arange(N + 1)
+        aot = shaver_kernel.fin_kernel(C, A, discount, r)
+        jit = py_kernel.fin_kernel(C, A, discount, r)
+        np.testing.assert_array_equal(aot[0], jit[0])
+        np.testing.assert_allclose(aot[1:], jit[1:], rtol=1e-12)